@@ -0,0 +1,136 @@
+import argparse
+import ast
+import dataclasses
+import json
+import sys
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from hlir import Operator, symbol_name
+from visitor import PyVisitor
+
+DEMOTIONS = ("py.load", "py.store")
+
+
+def deep_size(obj, seen: set[int]) -> int:
+    """ sys.getsizeof of obj and everything reachable from it, each object counted once per `seen` """
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(it, seen) for it in obj)
+    elif dataclasses.is_dataclass(obj):
+        size += deep_size(obj.__dict__, seen)
+    return size
+
+
+@dataclass
+class TracingVisitor(PyVisitor):
+    """ PyVisitor that measures the memory still allocated after each visit_FunctionDef """
+    allocated: Dict[int, int] = field(default_factory=dict)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> Operator:
+        before, _ = tracemalloc.get_traced_memory()
+        op = super().visit_FunctionDef(node)
+        after, _ = tracemalloc.get_traced_memory()
+        self.allocated[id(op)] = after - before
+        return op
+
+
+@dataclass
+class Footprint:
+    symbol: str
+    kind: str
+    operators: Counter = field(default_factory=Counter)
+    demotions: int = 0
+    region_depth: int = 0
+    values: int = 0
+    bytes: int = 0
+    traced_bytes: Optional[int] = None
+
+    @staticmethod
+    def measure(op: Operator, symbol: str, allocated: Dict[int, int]) -> 'Footprint':
+        footprint = Footprint(symbol, f"{op.dialect}.{op.name}")
+        values = set()
+
+        def walk(it: Operator, depth: int):
+            name = f"{it.dialect}.{it.name}"
+            footprint.operators[name] += 1
+            if name in DEMOTIONS:
+                footprint.demotions += 1
+            values.update(v.name for v in it.return_names)
+            values.update(v.name for v in it.arguments)
+            for block in it.blocks:
+                footprint.region_depth = max(footprint.region_depth, depth + 1)
+                if block.label:
+                    values.update(v.name for v, _ in block.label.params)
+                for child in block.items:
+                    walk(child, depth + 1)
+
+        walk(op, 0)
+        footprint.values = len(values)
+        footprint.bytes = deep_size(op, set())
+        footprint.traced_bytes = allocated.get(id(op))
+        return footprint
+
+    def to_json(self) -> dict:
+        result = {f.name: getattr(self, f.name) for f in dataclasses.fields(self)}
+        result['operators'] = dict(self.operators.most_common())
+        return result
+
+
+def report(module: Operator, allocated: Optional[Dict[int, int]] = None) -> dict:
+    """ footprint of every func.func/py.class in module, largest first, plus module totals """
+    functions: List[Footprint] = []
+
+    def collect(op: Operator, prefix: str):
+        for block in op.blocks:
+            for child in block.items:
+                symbol = symbol_name(child)
+                name = prefix
+                if symbol is not None:
+                    name = f"{prefix}.{symbol}" if prefix else symbol
+                    functions.append(Footprint.measure(child, name, allocated or {}))
+                collect(child, name)
+
+    collect(module, "")
+    functions.sort(key=lambda f: f.bytes, reverse=True)
+    total = Footprint.measure(module, "", {})
+    return {
+        'operators': sum(total.operators.values()),
+        'demotions': total.demotions,
+        'values': total.values,
+        'bytes': total.bytes,
+        'functions': [f.to_json() for f in functions],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="per-function IR footprint of translated python files, as JSON")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="also record memory allocated while translating each function")
+    args = parser.parse_args()
+    result = {}
+    for path in args.files:
+        with open(path) as f:
+            tree = ast.parse(f.read(), path)
+        if args.tracemalloc:
+            tracemalloc.start()
+            visitor = TracingVisitor()
+            module_op = visitor.visit_Module(tree)
+            tracemalloc.stop()
+            result[path] = report(module_op, visitor.allocated)
+        else:
+            result[path] = report(PyVisitor().visit_Module(tree))
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
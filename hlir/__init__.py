@@ -7,7 +7,7 @@ class ValueId:
     name: str
 
 
-@dataclass
+@dataclass(frozen=True)
 class SimpleType:
     value: str
 
@@ -38,7 +38,20 @@ class Operator:
         self.blocks.append(Block(op))
 
 
+def symbol_name(op: Operator) -> Optional[str]:
+    if op.dialect == "func" and op.name == "func":
+        return op.attributes.get('sym_name')
+    if op.dialect == "py" and op.name == "class":
+        return op.attributes.get('name')
+    return None
+
+
 @dataclass
 class FunctionTypeAttr:
     types: List[SimpleType] = field(default_factory=list)
     returns: SimpleType = None
+
+
+@dataclass
+class LiteralAttr:
+    text: str
@@ -2,7 +2,7 @@ import dataclasses
 from dataclasses import dataclass
 from typing import Dict, List
 
-from hlir import Operator, Block, Block, FunctionTypeAttr
+from hlir import Operator, Block, Block, FunctionTypeAttr, LiteralAttr
 
 
 @dataclass
@@ -42,6 +42,8 @@ class DefaultPrinter:
             if isinstance(attr, FunctionTypeAttr):
                 arg_types = ", ".join(t.value for t in attr.types)
                 items.append(f"{k}=({arg_types}) -> {attr.returns.value}")
+            elif isinstance(attr, LiteralAttr):
+                items.append(f"{k}={attr.text}")
             elif isinstance(attr, str):
                 items.append(f'{k}="{attr}"')
             else:
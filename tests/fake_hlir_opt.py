@@ -0,0 +1,46 @@
+""" Stand-in for `hlir-opt -split-input-file`: reports every py.binOp as an error.
+
+    --plain          report `<stdin>:L:C:` locations instead of `within split at ...`
+    --sleep S        wait S seconds before reading the input
+    --crash-after N  abort once N splits have been checked
+    --log PATH       append the number of splits of every run to PATH
+"""
+import argparse
+import os
+import sys
+import time
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--plain", action="store_true")
+parser.add_argument("--sleep", type=float, default=0)
+parser.add_argument("--crash-after", type=int)
+parser.add_argument("--log")
+args, _ = parser.parse_known_args()
+
+time.sleep(args.sleep)
+lines = sys.stdin.read().splitlines()
+splits = [1] + [i + 2 for i, line in enumerate(lines) if line == "// -----"]
+if args.log:
+    with open(args.log, "a") as f:
+        f.write(f"{len(splits)}\n")
+
+failed = False
+split = 0
+for number, line in enumerate(lines, 1):
+    if line == "// -----":
+        split += 1
+        if args.crash_after is not None and split >= args.crash_after:
+            sys.stderr.flush()
+            os.abort()
+        continue
+    column = line.find("py.binOp")
+    if column < 0:
+        continue
+    failed = True
+    start = splits[split]
+    if args.plain:
+        print(f"<stdin>:{number}:{column}: error: unexpected py.binOp", file=sys.stderr)
+    else:
+        print(f"within split at <stdin>:{start} offset :{number - start + 1}:{column}: error: unexpected py.binOp",
+              file=sys.stderr)
+sys.exit(1 if failed else 0)
@@ -0,0 +1,67 @@
+import ast
+import json
+import tracemalloc
+
+from footprint import TracingVisitor, report
+from visitor import PyVisitor
+
+CODE = """
+def f(x: int) -> int:
+    a = x
+    a = a + 1
+    if a:
+        b = a
+    return a
+
+class A:
+    z: int
+    def g(y: int) -> int:
+        return y
+"""
+
+
+def by_symbol(result: dict) -> dict:
+    return {f["symbol"]: f for f in result["functions"]}
+
+
+def test_report_counts():
+    result = report(PyVisitor().visit_Module(ast.parse(CODE)))
+    functions = by_symbol(result)
+    assert set(functions) == {"f", "A", "A.g"}
+
+    f = functions["f"]
+    assert f["kind"] == "func.func"
+    assert f["operators"] == {"func.func": 1, "py.assign": 2, "py.store": 2, "py.load": 4,
+                              "py.constant": 1, "py.binOp": 1, "py.if": 1, "func.return": 1}
+    assert f["demotions"] == 6
+    assert f["region_depth"] == 2
+    # %x %a %a.1 %2 %3 %a.4 %a.5 %b %a.6
+    assert f["values"] == 9
+    assert f["bytes"] > 0
+    assert f["traced_bytes"] is None
+
+    cls = functions["A"]
+    assert cls["kind"] == "py.class"
+    assert cls["operators"] == {"py.class": 1, "py.annField": 1, "func.func": 1, "func.return": 1}
+    assert cls["region_depth"] == 2
+    assert functions["A.g"]["region_depth"] == 1
+    assert functions["A.g"]["values"] == 1
+
+    assert result["operators"] == 18
+    assert result["demotions"] == 6
+    assert [fn["bytes"] for fn in result["functions"]] == sorted((fn["bytes"] for fn in result["functions"]),
+                                                                 reverse=True)
+    json.dumps(result)
+
+
+def test_tracemalloc_records_every_function():
+    tracemalloc.start()
+    try:
+        v = TracingVisitor()
+        module = v.visit_Module(ast.parse(CODE))
+    finally:
+        tracemalloc.stop()
+    functions = by_symbol(report(module, v.allocated))
+    assert functions["f"]["traced_bytes"] > 0
+    assert functions["A.g"]["traced_bytes"] > 0
+    assert functions["A"]["traced_bytes"] is None
@@ -0,0 +1,60 @@
+import ast
+
+import visitor
+from hlir import SimpleType
+from hlir.printer import DefaultPrinter
+from visitor import PyVisitor, TypeEnv, parse_type
+
+
+def annotation(text: str) -> ast.expr:
+    return ast.parse(text, mode="eval").body
+
+
+def test_type_env_lookup_falls_through_scopes():
+    env = TypeEnv()
+    env["%a"] = SimpleType("!_.int")
+    env.push()
+    env["%b"] = SimpleType("!_.float")
+    assert env["%a"] == SimpleType("!_.int")
+    assert env.get("%b") == SimpleType("!_.float")
+    env.pop()
+    assert env.get("%b") is None
+    assert env.scopes == [{"%a": SimpleType("!_.int")}]
+
+
+def test_function_names_do_not_leak_into_next_function():
+    v = PyVisitor()
+    module = v.visit_Module(ast.parse("def f(a: int) -> int:\n    return a\n"
+                                      "def g(b: int) -> int:\n    return a\n"))
+    assert v.value_types.scopes == [{}]
+    g_return = module.blocks[0].items[1].blocks[0].items[-1]
+    assert g_return.argument_types == [SimpleType("!_.Any")]
+
+
+def test_control_flow_regions_share_function_scope():
+    ir = "".join(DefaultPrinter().render_operator(PyVisitor().visit_Module(ast.parse(
+        "def f(xs: List[int], c: bool) -> List[int]:\n"
+        "    if c:\n"
+        "        ys: List[int] = xs\n"
+        "    return [y for y in ys]\n"))))
+    assert '"linalg.generic"' in ir
+
+
+def test_equal_annotations_are_interned():
+    first = parse_type(annotation("List[int]"))
+    assert parse_type(annotation("List[int]")) is first
+    assert first == SimpleType("!_.List<int>")
+    assert parse_type(annotation("List[float]")) is not first
+    assert parse_type(None) is parse_type(None)
+
+
+def test_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(visitor, "PARSED_TYPES", type(visitor.PARSED_TYPES)())
+    monkeypatch.setattr(visitor, "PARSED_TYPES_LIMIT", 2)
+    a = parse_type(annotation("A"))
+    parse_type(annotation("B"))
+    assert parse_type(annotation("A")) is a
+    parse_type(annotation("C"))
+    assert len(visitor.PARSED_TYPES) == 2
+    assert parse_type(annotation("A")) is a
+    assert ("name", "B") not in visitor.PARSED_TYPES
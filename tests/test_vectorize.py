@@ -0,0 +1,168 @@
+import ast
+import re
+
+import pytest
+
+from hlir.printer import DefaultPrinter
+from visitor import PyVisitor
+
+
+def translate(code: str) -> str:
+    return "".join(DefaultPrinter().render_operator(PyVisitor().visit_Module(ast.parse(code))))
+
+
+def assert_unique_definitions(ir: str):
+    defined = []
+    for line in ir.splitlines():
+        if match := re.match(r"\s*(%[\w.$-]+(?:, %[\w.$-]+)*) = ", line):
+            defined += match.group(1).split(", ")
+        if match := re.match(r"\s*\^bb0\((.*)\):", line):
+            defined += re.findall(r"(%[\w.$-]+):", match.group(1))
+    assert len(defined) == len(set(defined)), ir
+
+
+def test_list_comprehension_is_parallel_generic():
+    ir = translate("def f(xs: List[int]) -> List[int]:\n    return [x * 2 for x in xs]\n")
+    assert ir.count('"linalg.generic"') == 1
+    assert "#linalg.iterator_type<parallel>" in ir
+    assert '"tensor.empty"' in ir
+    assert "(!_.List<int>) -> tensor<?xi64>" in ir
+    assert "(tensor<?xi64>) -> !_.List<int>" in ir
+    assert '"linalg.yield"' in ir
+    assert_unique_definitions(ir)
+
+
+def test_generator_expression_is_materialized():
+    ir = translate("def f(xs: List[float]) -> List[float]:\n    return list(x + 1 for x in xs)\n")
+    assert ir.count('"linalg.generic"') == 1
+    assert "tensor<?xf64>" in ir
+
+
+def test_sum_is_reduction():
+    ir = translate("def f(xs: List[int]) -> int:\n    return sum(x * x for x in xs)\n")
+    assert "#linalg.iterator_type<reduction>" in ir
+    assert "affine_map<(d0) -> ()>" in ir
+    assert '"arith.addi"' in ir
+    assert '"tensor.from_elements"' in ir
+    assert "(tensor<i64>) -> i64" in ir
+    assert_unique_definitions(ir)
+
+
+def test_sum_of_float_list():
+    ir = translate("def f(xs: List[float]) -> float:\n    return sum(xs)\n")
+    assert '"arith.addf"' in ir
+    assert "{value=0.0 : f64}" in ir
+
+
+def test_zip_is_cut_to_shortest_input():
+    ir = translate("def f(xs: List[int], ys: List[int]) -> List[int]:\n"
+                   "    return [a * b for a, b in zip(xs, ys)]\n")
+    assert ir.count('"tensor.dim"') == 2
+    assert '"arith.minsi"' in ir
+    assert ir.count('"tensor.extract_slice"') == 2
+    assert "operandSegmentSizes=array<i32: 2, 1>" in ir
+    assert_unique_definitions(ir)
+
+
+def test_comprehension_target_does_not_clash_with_function_name():
+    ir = translate("def f(xs: List[int]) -> List[int]:\n"
+                   "    x: int = xs[0]\n"
+                   "    z = [x + 1 for x in xs]\n"
+                   "    return [xs[0] + x for x in xs]\n")
+    assert ir.count('"linalg.generic"') == 2
+    assert_unique_definitions(ir)
+
+
+def test_subscript_is_tensor_extract():
+    ir = translate("def f(xs: List[int], i: int) -> int:\n    return xs[i]\n")
+    assert "(!_.int) -> index" in ir
+    assert '"tensor.extract"' in ir
+    assert "(tensor<?xi64>, index) -> i64" in ir
+
+
+def test_accumulating_loop_is_reduction():
+    ir = translate("def f(xs: List[int]) -> int:\n"
+                   "    acc = 1\n"
+                   "    for x in xs:\n"
+                   "        acc *= x + 1\n"
+                   "    return acc\n")
+    assert '"py.for"' not in ir
+    assert '"arith.muli"' in ir
+    assert '"py.augAssign"' in ir and 'op="mult"' in ir
+
+
+def test_loop_reading_accumulator_stays_scalar():
+    ir = translate("def f(xs: List[int]) -> int:\n"
+                   "    acc = 1\n"
+                   "    for x in xs:\n"
+                   "        acc *= acc + x\n"
+                   "    return acc\n")
+    assert '"py.for"' in ir
+    assert '"linalg.generic"' not in ir
+
+
+def test_element_type_is_inferred_from_expression():
+    ir = translate("def f(xs: List[int], s: float) -> List[float]:\n    return [x * s for x in xs]\n")
+    assert "^bb0(%x_in.5: i64, %out.6: f64):" in ir
+    assert "(!_.Any) -> f64" in ir
+    assert "(tensor<?xf64>) -> !_.List<float>" in ir
+    ir = translate("def f(xs: List[int]) -> float:\n    return sum(x + 0.5 for x in xs)\n")
+    assert '"arith.addf"' in ir
+    assert "(tensor<f64>) -> f64" in ir
+
+
+def test_target_shadowing_a_list_is_typed_as_element():
+    with pytest.raises(NotImplementedError):
+        translate("def f(xs: List[int], ys: List[int]) -> List[int]:\n    return [xs[0] for xs in ys]\n")
+    ir = translate("def f(xs: List[int], ys: List[int]) -> List[int]:\n    return [xs - 1 for xs in ys]\n")
+    assert "(!_.List<int>) -> tensor<?xi64>" in ir
+    assert '"builtin.unrealized_conversion_cast"(%ys)' in ir
+    assert '"builtin.unrealized_conversion_cast"(%xs)' not in ir
+
+
+def test_nested_function_keeps_outer_lowering():
+    ir = translate("def f(xs: List[int]) -> int:\n"
+                   "    def g(y: int) -> int:\n"
+                   "        return y\n"
+                   "    a = xs[0]\n"
+                   "    return sum(xs)\n")
+    assert '"linalg.generic"' in ir
+    assert '"py.call"' not in ir
+    assert '"tensor.extract"' in ir
+
+
+def test_negative_subscript_counts_from_end():
+    ir = translate("def f(xs: List[int], i: int) -> int:\n    return xs[i]\n")
+    assert 'predicate=2 : i64' in ir
+    assert '"tensor.dim"' in ir
+    assert '"arith.addi"' in ir
+    assert "(i1, index, index) -> index" in ir
+    ir = translate("def f(xs: List[int]) -> int:\n    return xs[0]\n")
+    assert '"arith.select"' not in ir
+
+
+def test_untyped_accumulation_stays_scalar():
+    ir = translate("def f(xs: List[int]) -> float:\n"
+                   "    acc = 0\n"
+                   "    for x in xs:\n"
+                   "        acc += x / 2\n"
+                   "    return acc\n")
+    assert '"py.for"' in ir
+    assert '"linalg.generic"' not in ir
+
+
+@pytest.mark.parametrize("code", [
+    "def f(xs: List[int]) -> List[float]:\n    return [x / 2 for x in xs]\n",
+    "def f(xs: List[int]) -> List[bool]:\n    return [x > 0 for x in xs]\n",
+    "def f(xs: List[int]) -> List[int]:\n    return [abs(x) for x in xs]\n",
+    "def f(xs: List[int]) -> float:\n    return sum(x / 2 for x in xs)\n",
+    "def f(xs: List[int]) -> List[int]:\n    return [x for x in xs if x]\n",
+    "def f(xs: List[str]) -> List[str]:\n    return [x for x in xs]\n",
+    "def f(xs: List[int], ys: List[int]) -> List[int]:\n    return [x + y for x in xs for y in ys]\n",
+    "def f(xs: List[int], ys: List[float]) -> List[int]:\n    return [a for a, b in zip(xs, ys)]\n",
+    "def f(xs: int) -> int:\n    return xs[0]\n",
+    "def f(xs: List[int]) -> List[int]:\n    return xs[1:]\n",
+])
+def test_unsupported_patterns_raise(code: str):
+    with pytest.raises(NotImplementedError):
+        translate(code)
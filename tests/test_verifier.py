@@ -0,0 +1,66 @@
+import ast
+import sys
+from pathlib import Path
+
+import pytest
+
+from verifier import RenderedModule, VerifierPool
+from visitor import PyVisitor
+
+FAKE = [sys.executable, str(Path(__file__).with_name("fake_hlir_opt.py"))]
+
+CLEAN = "def f(x: int) -> int:\n    return x\n"
+BROKEN = "def f(x: int) -> int:\n    return x\n\ndef g(x: int, y: int) -> int:\n    a = x + y\n    return a\n"
+
+
+def translate(code: str):
+    return PyVisitor().visit_Module(ast.parse(code))
+
+
+def binop_line(module) -> int:
+    lines = RenderedModule.from_operator(module).text.splitlines()
+    return next(i for i, line in enumerate(lines, 1) if "py.binOp" in line)
+
+
+def test_modules_are_batched(tmp_path):
+    log = tmp_path / "runs"
+    modules = [translate(CLEAN) for _ in range(5)]
+    with VerifierPool(command=FAKE + ["--log", str(log)], batch_size=2, workers=2) as pool:
+        assert pool.verify(modules) == [[]] * 5
+    assert sorted(log.read_text().split()) == ["1", "2", "2"]
+
+
+@pytest.mark.parametrize("flags", [[], ["--plain"]])
+def test_diagnostics_map_to_module_and_function(flags):
+    modules = [translate(CLEAN), translate(BROKEN), translate(CLEAN), translate(BROKEN)]
+    with VerifierPool(command=FAKE + flags, batch_size=3) as pool:
+        results = pool.verify(modules)
+    assert results[0] == [] and results[2] == []
+    for index in (1, 3):
+        [diagnostic] = results[index]
+        assert diagnostic.module == index
+        assert diagnostic.function == "g"
+        assert diagnostic.line == binop_line(modules[index])
+        assert diagnostic.severity == "error"
+        assert diagnostic.message == "unexpected py.binOp"
+
+
+def test_timeout_reports_every_module():
+    with VerifierPool(command=FAKE + ["--sleep", "5"], timeout=0.5) as pool:
+        results = pool.verify([translate(CLEAN), translate(CLEAN)])
+    assert all(len(r) == 1 and "timed out" in r[0].message for r in results)
+
+
+def test_missing_command_reports_every_module():
+    with VerifierPool(command=["/nonexistent/hlir-opt"]) as pool:
+        results = pool.verify([translate(CLEAN), translate(CLEAN)])
+    assert all(len(r) == 1 and "cannot run verifier" in r[0].message for r in results)
+
+
+def test_crash_leaves_later_modules_unverified():
+    modules = [translate(BROKEN), translate(CLEAN), translate(CLEAN)]
+    with VerifierPool(command=FAKE + ["--crash-after", "1"]) as pool:
+        results = pool.verify(modules)
+    assert [d.message for d in results[0]] == ["unexpected py.binOp"]
+    for r in results[1:]:
+        assert len(r) == 1 and r[0].message.startswith("not verified")
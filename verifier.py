@@ -0,0 +1,146 @@
+import bisect
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from hlir import Operator, symbol_name
+from hlir.printer import DefaultPrinter
+
+DEFAULT_COMMAND = ["hlir-opt", "-hlir-print-op-generic", "-allow-unregistered-dialect", "-split-input-file"]
+SPLIT_MARKER = "// -----"
+
+# `<stdin>:12:5: error: ...` or, under -split-input-file, `within split at <stdin>:10 offset :3:5: error: ...`
+SPLIT_DIAGNOSTIC = re.compile(r"^within split at .*:(\d+) offset :(\d+):(\d+): (error|warning|note|remark): (.*)$")
+DIAGNOSTIC = re.compile(r"^.*:(\d+):(\d+): (error|warning|note|remark): (.*)$")
+
+
+@dataclass
+class Diagnostic:
+    module: int
+    function: Optional[str]
+    line: int
+    column: int
+    severity: str
+    message: str
+
+
+@dataclass
+class SpanPrinter(DefaultPrinter):
+    """ DefaultPrinter that remembers which lines every func.func/py.class occupies """
+    spans: list[Tuple[int, int, str]] = field(default_factory=list)
+
+    def render_operator(self, op: Operator, indent: str = "") -> list[str]:
+        start = len(self.sb)
+        super().render_operator(op, indent)
+        symbol = symbol_name(op)
+        if symbol is not None:
+            self.spans.append((start, len(self.sb), symbol))
+        return self.sb
+
+    def line_spans(self) -> List[Tuple[int, int, str]]:
+        """ spans as 1-based inclusive line ranges, innermost first """
+        lines = [1]
+        for chunk in self.sb:
+            lines.append(lines[-1] + chunk.count("\n"))
+        return [(lines[start], lines[end], symbol)
+                for start, end, symbol in self.spans]
+
+
+@dataclass
+class RenderedModule:
+    text: str
+    spans: List[Tuple[int, int, str]]
+
+    @staticmethod
+    def from_operator(module: Operator) -> 'RenderedModule':
+        printer = SpanPrinter()
+        printer.render_operator(module)
+        return RenderedModule("".join(printer.sb), printer.line_spans())
+
+    def function_at(self, line: int) -> Optional[str]:
+        for start, end, symbol in self.spans:
+            if start <= line <= end:
+                return symbol
+        return None
+
+
+@dataclass
+class VerifierPool:
+    """ Verifies many modules with few verifier processes.
+
+        Modules are grouped into batches of `batch_size`, every batch is piped through a single
+        `command` run separated by `// -----` markers, and up to `workers` batches run at once on a
+        thread pool that lives as long as the VerifierPool. The command must accept the split
+        markers (mlir-opt style `-split-input-file`) and report diagnostics on stderr.
+    """
+    command: List[str] = field(default_factory=lambda: list(DEFAULT_COMMAND))
+    workers: int = 4
+    batch_size: int = 64
+    timeout: Optional[float] = None
+    executor: Optional[ThreadPoolExecutor] = field(default=None, repr=False)
+
+    def __enter__(self) -> 'VerifierPool':
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def verify(self, modules: List[Operator]) -> List[List[Diagnostic]]:
+        """ Returns the diagnostics of every module, in the order the modules were given """
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        rendered = [RenderedModule.from_operator(m) for m in modules]
+        batches = [range(i, min(i + self.batch_size, len(rendered)))
+                   for i in range(0, len(rendered), self.batch_size)]
+        results: List[List[Diagnostic]] = [[] for _ in modules]
+        futures = [self.executor.submit(self.verify_batch, [rendered[i] for i in batch]) for batch in batches]
+        for batch, future in zip(batches, futures):
+            for diagnostic in future.result():
+                diagnostic.module = batch[diagnostic.module]
+                results[diagnostic.module].append(diagnostic)
+        return results
+
+    def verify_batch(self, batch: List[RenderedModule]) -> List[Diagnostic]:
+        starts = []
+        line = 1
+        for module in batch:
+            starts.append(line)
+            line += module.text.count("\n") + 2
+        text = f"\n{SPLIT_MARKER}\n".join(m.text for m in batch) + "\n"
+        try:
+            proc = subprocess.run(self.command, input=text, capture_output=True, text=True, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            return [Diagnostic(i, None, 0, 0, "error", f"verifier timed out after {self.timeout}s")
+                    for i in range(len(batch))]
+        except OSError as e:
+            return [Diagnostic(i, None, 0, 0, "error", f"cannot run verifier: {e}") for i in range(len(batch))]
+        diagnostics = []
+        for row in proc.stderr.splitlines():
+            if match := SPLIT_DIAGNOSTIC.match(row):
+                split, offset, column, severity, message = match.groups()
+                global_line = int(split) + int(offset) - 1
+            elif match := DIAGNOSTIC.match(row):
+                global_line, column, severity, message = match.groups()
+                global_line = int(global_line)
+            else:
+                continue
+            index = max(bisect.bisect_right(starts, global_line) - 1, 0)
+            local_line = global_line - starts[index] + 1
+            diagnostics.append(Diagnostic(index, batch[index].function_at(local_line),
+                                          local_line, int(column), severity, message))
+        if proc.returncode < 0:
+            # killed by a signal, modules after the last one it reported on were never checked
+            reached = max((d.module for d in diagnostics), default=-1)
+            message = f"not verified, verifier killed by signal {-proc.returncode}"
+            diagnostics += [Diagnostic(i, None, 0, 0, "error", message) for i in range(reached + 1, len(batch))]
+        elif proc.returncode != 0 and not diagnostics:
+            message = proc.stderr.strip() or f"verifier exited with {proc.returncode}"
+            diagnostics = [Diagnostic(i, None, 0, 0, "error", message) for i in range(len(batch))]
+        return diagnostics
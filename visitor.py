@@ -1,21 +1,61 @@
 import _ast
 import ast
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Optional, Hashable
 
-from hlir import Operator, Block, ValueId, BlockLabel, SimpleType, FunctionTypeAttr
+from hlir import Operator, Block, ValueId, BlockLabel, SimpleType, FunctionTypeAttr, LiteralAttr
 
 RETURN_TYPE_KEY = "RETURN"
 
-
-def op2return_name(op: Operator) -> ValueId:
-    return ValueId("%" + str(id(op))[-3:])
+# py scalar element -> builtin element type used inside tensor/linalg regions
+TENSOR_ELEMENT_TYPES = {"int": "i64", "float": "f64"}
+LIST_TYPE_PREFIXES = ("!_.List<", "!_.list<")
+# ShapedType::kDynamic in static_sizes of tensor.extract_slice
+DYNAMIC_SIZE = -9223372036854775808
+# reduction operator -> (integer op, float op, identity)
+REDUCTIONS = {"add": ("addi", "addf", 0), "mult": ("muli", "mulf", 1)}
+
+ANY_TYPE = SimpleType("!_.Any")
+NONE_TYPE = SimpleType("()")
+# annotation structure -> interned SimpleType, least recently used evicted first
+PARSED_TYPES: OrderedDict[Hashable, SimpleType] = OrderedDict()
+PARSED_TYPES_LIMIT = 4096
+
+
+def type_key(t: _ast.expr) -> Hashable:
+    """ structural key of an annotation, equal for equal annotations wherever they appear """
+    if isinstance(t, ast.Name):
+        return "name", t.id
+    elif isinstance(t, ast.Attribute):
+        return "attribute", type_key(t.value), t.attr
+    elif isinstance(t, ast.Subscript):
+        return "subscript", type_key(t.value), type_key(t.slice)
+    elif isinstance(t, ast.Tuple):
+        return ("tuple",) + tuple(type_key(e) for e in t.elts)
+    elif isinstance(t, ast.Constant):
+        return "constant", repr(t.value)
+    else:
+        return ast.dump(t)
 
 
 def parse_type(t) -> SimpleType:
     if t is None:
-        return SimpleType(f"()")
-    elif isinstance(t, ast.Subscript):
+        return NONE_TYPE
+    key = type_key(t)
+    parsed = PARSED_TYPES.get(key)
+    if parsed is not None:
+        PARSED_TYPES.move_to_end(key)
+        return parsed
+    parsed = parse_type_uncached(t)
+    PARSED_TYPES[key] = parsed
+    if len(PARSED_TYPES) > PARSED_TYPES_LIMIT:
+        PARSED_TYPES.popitem(last=False)
+    return parsed
+
+
+def parse_type_uncached(t) -> SimpleType:
+    if isinstance(t, ast.Subscript):
         return SimpleType(f"!_.{ast.unparse(t)}".replace("[", "<").replace("]", ">"))
     elif isinstance(t, ast.Name):
         return SimpleType(f"!_.{t.id}")
@@ -23,13 +63,70 @@ def parse_type(t) -> SimpleType:
         raise NotImplementedError(ast.unparse(t))
 
 
+def list_element(t: Optional[SimpleType]) -> Optional[str]:
+    """ `!_.List<int>` -> `int` when the element can live in a tensor """
+    if t is None or not t.value.startswith(LIST_TYPE_PREFIXES) or not t.value.endswith(">"):
+        return None
+    element = t.value[len(LIST_TYPE_PREFIXES[0]):-1]
+    return element if element in TENSOR_ELEMENT_TYPES else None
+
+
+def tensor_type(element: str, rank: int = 1) -> SimpleType:
+    return SimpleType(f"tensor<{'?x' * rank}{TENSOR_ELEMENT_TYPES[element]}>")
+
+
+def cast_op(value: ValueId, source: SimpleType, target: SimpleType) -> Operator:
+    op = Operator("unrealized_conversion_cast", dialect="builtin")
+    op.arguments.append(value)
+    op.argument_types.append(source)
+    op.return_types.append(target)
+    return op
+
+
+def constant_op(text: str, t: SimpleType) -> Operator:
+    op = Operator("constant", dialect="arith")
+    op.attributes['value'] = LiteralAttr(f"{text} : {t.value}")
+    op.return_types.append(t)
+    return op
+
+
+@dataclass
+class TypeEnv:
+    """ value name -> type, one scope per open function, class or linalg body, innermost last """
+    scopes: list[dict[str, SimpleType]] = field(default_factory=lambda: [dict()])
+
+    def push(self):
+        self.scopes.append(dict())
+
+    def pop(self):
+        self.scopes.pop()
+
+    def get(self, name: str, default: Optional[SimpleType] = None) -> Optional[SimpleType]:
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return default
+
+    def __getitem__(self, name: str) -> SimpleType:
+        t = self.get(name)
+        if t is None:
+            raise KeyError(name)
+        return t
+
+    def __setitem__(self, name: str, t: SimpleType):
+        self.scopes[-1][name] = t
+
+
 @dataclass
 class PyVisitor(ast.NodeVisitor):
     parent_blocks: list[list[Operator]] = field(default_factory=list)
     ssa_scopes: list[dict[str, list[Operator]]] = field(default_factory=list)
     var_scopes: list[set[str]] = field(default_factory=list)
-    value_types: Dict[str, SimpleType] = field(default_factory=dict)
+    value_types: TypeEnv = field(default_factory=TypeEnv)
     is_function_context: bool = False
+    # names are unique per func.func; bound_names renames comprehension targets inside linalg bodies
+    name_counter: int = 0
+    bound_names: dict[str, ValueId] = field(default_factory=dict)
 
     #     mod = Module(stmt* body, type_ignore* type_ignores)
     #         | Interactive(stmt* body)
@@ -52,19 +149,209 @@ class PyVisitor(ast.NodeVisitor):
         if isinstance(expr, ast.Name):
             value_id = self.visit_Name(expr)
             op.arguments.append(value_id)
-            op.argument_types.append(self.value_types.get(value_id.name, SimpleType("!_.Any")))
+            op.argument_types.append(self.value_types.get(value_id.name, ANY_TYPE))
         else:
             new_operand = self.visit_expr(expr)
-            new_operand.return_names.append(op2return_name(new_operand))
             self.parent_blocks[-1].append(new_operand)
             op.arguments += new_operand.return_names
-            op.argument_types.append(SimpleType("!_.Any"))
+            op.argument_types += new_operand.return_types or [ANY_TYPE]
 
     @staticmethod
     def add_region(op: Operator, items: list[Operator]):
         blocks = [Block(items)]
         op.blocks.append(Block(blocks))
 
+    def fresh_name(self, hint: str = "") -> ValueId:
+        """ `%hint.N`, the dot keeps it apart from every python identifier """
+        self.name_counter += 1
+        return ValueId(f"%{hint}.{self.name_counter}" if hint else f"%{self.name_counter}")
+
+    def emit(self, op: Operator) -> ValueId:
+        if not op.return_names:
+            op.return_names.append(self.fresh_name())
+        self.parent_blocks[-1].append(op)
+        return op.return_names[-1]
+
+    def tensor_length(self, tensor: ValueId, scalar: str, zero: Optional[ValueId] = None) -> ValueId:
+        index_type = SimpleType("index")
+        zero = zero or self.emit(constant_op("0", index_type))
+        dim = Operator("dim", dialect="tensor")
+        dim.arguments += [tensor, zero]
+        dim.argument_types += [tensor_type(scalar), index_type]
+        dim.return_types.append(index_type)
+        return self.emit(dim)
+
+    def name_type(self, node: ast.Name) -> Optional[SimpleType]:
+        """ type of the value visit_Name would resolve node to, without emitting a load """
+        if node.id in self.bound_names:
+            return self.value_types.get(self.bound_names[node.id].name)
+        if node.id in self.var_scopes[-1]:
+            return None
+        return self.value_types.get(f"%{node.id}")
+
+    def element_scalar(self, expr: _ast.expr, iteration: List[Tuple[str, ast.Name, str]]) -> Optional[str]:
+        """ scalar type of `expr` evaluated per element, None when it cannot be typed statically """
+        if isinstance(expr, ast.Name):
+            for name, _, scalar in iteration:
+                if name == expr.id:
+                    return scalar
+            t = self.name_type(expr)
+            scalar = t.value[len("!_."):] if t is not None else None
+            return scalar if scalar in TENSOR_ELEMENT_TYPES else None
+        elif isinstance(expr, ast.Constant) and type(expr.value) in (int, float):
+            return type(expr.value).__name__
+        elif isinstance(expr, ast.Subscript) and isinstance(expr.value, ast.Name) \
+                and not isinstance(expr.slice, ast.Slice) and expr.value.id not in {n for n, _, _ in iteration}:
+            return list_element(self.name_type(expr.value))
+        elif isinstance(expr, ast.BinOp) and isinstance(expr.op, (ast.Add, ast.Sub, ast.Mult)):
+            left = self.element_scalar(expr.left, iteration)
+            right = self.element_scalar(expr.right, iteration)
+            if left is None or right is None:
+                return None
+            # int op float promotes to float, like python does
+            return left if left == right else "float"
+        return None
+
+    def match_iteration(self, target: _ast.expr, iter_: _ast.expr) -> Optional[List[Tuple[str, ast.Name, str]]]:
+        """ `x in xs` or `(x, y) in zip(xs, ys)` over typed lists -> [(target, source, element)] """
+        if not self.is_function_context:
+            return None
+        if isinstance(target, ast.Name):
+            targets, sources = [target], [iter_]
+        elif isinstance(target, ast.Tuple) and isinstance(iter_, ast.Call) \
+                and isinstance(iter_.func, ast.Name) and iter_.func.id == "zip" \
+                and not iter_.keywords and len(iter_.args) == len(target.elts):
+            targets, sources = target.elts, iter_.args
+        else:
+            return None
+        iteration = []
+        for t, src in zip(targets, sources):
+            if not isinstance(t, ast.Name) or not isinstance(src, ast.Name):
+                return None
+            element = list_element(self.name_type(src))
+            if element is None:
+                return None
+            iteration.append((t.id, src, element))
+        if len({element for _, _, element in iteration}) != 1:
+            return None
+        return iteration
+
+    def match_comprehension(self, generators: list[ast.comprehension]) -> Optional[List[Tuple[str, ast.Name, str]]]:
+        if len(generators) != 1 or generators[0].ifs or generators[0].is_async:
+            return None
+        return self.match_iteration(generators[0].target, generators[0].iter)
+
+    def lower_generic(self, iteration: List[Tuple[str, ast.Name, str]], element: _ast.expr,
+                      reduction: Optional[str] = None) -> Operator:
+        """ Lowers `element` applied over `iteration` to a single `linalg.generic`.
+            Without `reduction` the result is a new list of the same length,
+            otherwise the elements are folded with `reduction` into a scalar.
+            Returns the final (not yet emitted) cast back to the py type.
+            Raises NotImplementedError when the element type cannot be inferred.
+        """
+        scalar = iteration[0][2]
+        result_scalar = self.element_scalar(element, iteration)
+        if result_scalar is None:
+            raise NotImplementedError(ast.unparse(element))
+        builtin_type = SimpleType(TENSOR_ELEMENT_TYPES[scalar])
+        result_type = SimpleType(TENSOR_ELEMENT_TYPES[result_scalar])
+        py_type = SimpleType(f"!_.{scalar}")
+        index_type = SimpleType("index")
+        inputs = []
+        for _, src, _ in iteration:
+            source = self.visit_Name(src)
+            list_type = self.value_types[source.name]
+            inputs.append(self.emit(cast_op(source, list_type, tensor_type(scalar))))
+        length = None
+        if len(inputs) > 1:
+            # zip stops at the shortest list, cut every input down to it
+            length = self.tensor_length(inputs[0], scalar)
+            for tensor in inputs[1:]:
+                shortest = Operator("minsi", dialect="arith")
+                shortest.arguments += [length, self.tensor_length(tensor, scalar)]
+                shortest.argument_types += [index_type, index_type]
+                shortest.return_types.append(index_type)
+                length = self.emit(shortest)
+            for i, tensor in enumerate(inputs):
+                sliced = Operator("extract_slice", dialect="tensor")
+                sliced.arguments += [tensor, length]
+                sliced.argument_types += [tensor_type(scalar), index_type]
+                sliced.return_types.append(tensor_type(scalar))
+                sliced.attributes['static_offsets'] = LiteralAttr("array<i64: 0>")
+                sliced.attributes['static_sizes'] = LiteralAttr(f"array<i64: {DYNAMIC_SIZE}>")
+                sliced.attributes['static_strides'] = LiteralAttr("array<i64: 1>")
+                sliced.attributes['operandSegmentSizes'] = LiteralAttr("array<i32: 1, 0, 1, 0>")
+                inputs[i] = self.emit(sliced)
+        if reduction is None:
+            empty = Operator("empty", dialect="tensor")
+            empty.arguments.append(length or self.tensor_length(inputs[0], scalar))
+            empty.argument_types.append(index_type)
+            empty.return_types.append(tensor_type(result_scalar))
+            init = self.emit(empty)
+            out_type = tensor_type(result_scalar)
+            out_map = "affine_map<(d0) -> (d0)>"
+            iterator = "parallel"
+        else:
+            identity = REDUCTIONS[reduction][2]
+            neutral = self.emit(constant_op(str(float(identity)) if result_scalar == "float" else str(identity),
+                                            result_type))
+            from_elements = Operator("from_elements", dialect="tensor")
+            from_elements.arguments.append(neutral)
+            from_elements.argument_types.append(result_type)
+            out_type = tensor_type(result_scalar, rank=0)
+            from_elements.return_types.append(out_type)
+            init = self.emit(from_elements)
+            out_map = "affine_map<(d0) -> ()>"
+            iterator = "reduction"
+
+        op = Operator("generic", dialect="linalg")
+        op.arguments += inputs + [init]
+        op.argument_types += [tensor_type(scalar)] * len(inputs) + [out_type]
+        op.return_types.append(out_type)
+        op.attributes['indexing_maps'] = LiteralAttr(
+            "[" + ", ".join(["affine_map<(d0) -> (d0)>"] * len(inputs) + [out_map]) + "]")
+        op.attributes['iterator_types'] = LiteralAttr(f"[#linalg.iterator_type<{iterator}>]")
+        op.attributes['operandSegmentSizes'] = LiteralAttr(f"array<i32: {len(inputs)}, 1>")
+
+        label = BlockLabel("^bb0")
+        label.params = [(self.fresh_name(f"{name}_in"), builtin_type) for name, _, _ in iteration]
+        out = self.fresh_name("out")
+        label.params.append((out, result_type))
+        outer_names = dict(self.bound_names)
+        self.parent_blocks.append([])
+        self.value_types.push()
+        for (name, _, _), (arg, _) in zip(iteration, label.params):
+            unpack = cast_op(arg, builtin_type, py_type)
+            unpack.return_names.append(self.fresh_name(name))
+            self.bound_names[name] = self.emit(unpack)
+            self.value_types[self.bound_names[name].name] = py_type
+        result = Operator("unrealized_conversion_cast", dialect="builtin")
+        result.return_types.append(result_type)
+        self.process_operand(result, element, "element")
+        yielded = self.emit(result)
+        if reduction is not None:
+            combine = Operator(REDUCTIONS[reduction][result_scalar == "float"], dialect="arith")
+            combine.arguments += [yielded, out]
+            combine.argument_types += [result_type, result_type]
+            combine.return_types.append(result_type)
+            yielded = self.emit(combine)
+        terminator = Operator("yield", dialect="linalg")
+        terminator.arguments.append(yielded)
+        terminator.argument_types.append(result_type)
+        self.parent_blocks[-1].append(terminator)
+        self.bound_names = outer_names
+        self.value_types.pop()
+        op.blocks.append(Block(self.parent_blocks.pop(), label))
+        generic = self.emit(op)
+
+        if reduction is None:
+            return cast_op(generic, out_type, SimpleType(f"!_.List<{result_scalar}>"))
+        extract = Operator("extract", dialect="tensor")
+        extract.arguments.append(generic)
+        extract.argument_types.append(out_type)
+        extract.return_types.append(result_type)
+        return cast_op(self.emit(extract), result_type, SimpleType(f"!_.{result_scalar}"))
+
     def visit_Module(self, node: ast.Module) -> Operator:
         """ Module(stmt* body, type_ignore* type_ignores) """
         op = Operator("module", dialect="builtin")
@@ -76,7 +363,7 @@ class PyVisitor(ast.NodeVisitor):
     def visit_expr(self, ctx: _ast.expr) -> Operator:
         op = self.visit(ctx)
         if not op.return_names:
-            op.return_names.append(op2return_name(op))
+            op.return_names.append(self.fresh_name())
         return op
 
     def visit_stmt(self, ctx: _ast.stmt) -> Operator:
@@ -94,7 +381,11 @@ class PyVisitor(ast.NodeVisitor):
         """
         self.ssa_scopes.append(dict())
         self.var_scopes.append(set())
+        self.value_types.push()
+        outer_context = self.is_function_context
         self.is_function_context = True
+        outer_counter, outer_names = self.name_counter, self.bound_names
+        self.name_counter, self.bound_names = 0, dict()
         op = Operator("func", dialect="func")
         # op.attributes['args'] = str(node.args)
         op.attributes['sym_name'] = str(node.name)
@@ -118,7 +409,9 @@ class PyVisitor(ast.NodeVisitor):
         # self.add_region(op, body_)
         self.ssa_scopes.pop()
         self.var_scopes.pop()
-        self.is_function_context = False
+        self.value_types.pop()
+        self.name_counter, self.bound_names = outer_counter, outer_names
+        self.is_function_context = outer_context
         return op
 
     def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> Operator:
@@ -130,7 +423,9 @@ class PyVisitor(ast.NodeVisitor):
         op.attributes['name'] = str(node.name)
         op.attributes['bases'] = [ast.unparse(b) for b in node.bases]
         op.attributes['keywords'] = [ast.unparse(k) for k in node.keywords]
+        self.value_types.push()
         self.process_region(op, node.body, "body")
+        self.value_types.pop()
         op.attributes['decorator_list'] = [ast.unparse(d) for d in node.decorator_list]
         return op
 
@@ -205,9 +500,24 @@ class PyVisitor(ast.NodeVisitor):
 
     def visit_For(self, node: ast.For) -> Operator:
         """ For(expr target, expr iter, stmt* body, stmt* orelse, string? type_comment) """
+        iteration = self.match_iteration(node.target, node.iter)
+        if iteration and not node.orelse and len(node.body) == 1 and isinstance(node.body[0], ast.AugAssign):
+            # `for x in xs: acc += f(x)` is a reduction, fold it with linalg and update acc once
+            stmt = node.body[0]
+            reduction = stmt.op.__class__.__dict__["__doc__"].lower()
+            if reduction in REDUCTIONS and isinstance(stmt.target, ast.Name) \
+                    and stmt.target.id not in {name for name, _, _ in iteration} \
+                    and not any(isinstance(n, ast.Name) and n.id == stmt.target.id for n in ast.walk(stmt.value)) \
+                    and self.element_scalar(stmt.value, iteration) is not None:
+                op = Operator("augAssign")
+                op.attributes['target'] = stmt.target.id
+                op.attributes['op'] = reduction
+                folded = self.lower_generic(iteration, stmt.value, reduction)
+                op.arguments.append(self.emit(folded))
+                op.argument_types += folded.return_types
+                return op
         op = Operator("for")
-        self.process_region(op, [node.iter], "iter")
-        self.process_region(op, node.body, "body")
+        self.process_operand(op, node.iter, "iter")
         if isinstance(node.target, ast.Name):
             op.attributes['target'] = node.target.id
         else:
@@ -314,7 +624,11 @@ class PyVisitor(ast.NodeVisitor):
         raise NotImplementedError(ast.unparse(node))
 
     def visit_ListComp(self, node: ast.ListComp) -> Operator:
-        raise NotImplementedError(ast.unparse(node))
+        """ ListComp(expr elt, comprehension* generators) """
+        iteration = self.match_comprehension(node.generators)
+        if iteration is None:
+            raise NotImplementedError(ast.unparse(node))
+        return self.lower_generic(iteration, node.elt)
 
     def visit_SetComp(self, node: ast.SetComp) -> Operator:
         raise NotImplementedError(ast.unparse(node))
@@ -323,7 +637,11 @@ class PyVisitor(ast.NodeVisitor):
         raise NotImplementedError(ast.unparse(node))
 
     def visit_GeneratorExp(self, node: ast.GeneratorExp) -> Operator:
-        raise NotImplementedError(ast.unparse(node))
+        """ GeneratorExp(expr elt, comprehension* generators) """
+        iteration = self.match_comprehension(node.generators)
+        if iteration is None:
+            raise NotImplementedError(ast.unparse(node))
+        return self.lower_generic(iteration, node.elt)
 
     def visit_Await(self, node: ast.Await) -> Operator:
         raise NotImplementedError(ast.unparse(node))
@@ -344,6 +662,16 @@ class PyVisitor(ast.NodeVisitor):
 
     def visit_Call(self, node: ast.Call) -> Operator:
         """ Call(expr func, expr* args, keyword* keywords) """
+        if isinstance(node.func, ast.Name) and node.func.id == "sum" and len(node.args) == 1 and not node.keywords:
+            arg = node.args[0]
+            if isinstance(arg, (ast.ListComp, ast.GeneratorExp)):
+                iteration = self.match_comprehension(arg.generators)
+                element = arg.elt
+            else:
+                iteration = self.match_iteration(ast.Name("_"), arg)
+                element = ast.Name("_")
+            if iteration:
+                return self.lower_generic(iteration, element, "add")
         op = Operator("call")
         node_func = node.func
         if isinstance(node_func, ast.Name):
@@ -375,16 +703,53 @@ class PyVisitor(ast.NodeVisitor):
         raise NotImplementedError(ast.unparse(node))
 
     def visit_Subscript(self, node: ast.Subscript) -> Operator:
-        raise NotImplementedError(ast.unparse(node))
+        """ Subscript(expr value, expr slice, expr_context ctx) """
+        if not self.is_function_context or not isinstance(node.value, ast.Name) \
+                or isinstance(node.slice, ast.Slice):
+            raise NotImplementedError(ast.unparse(node))
+        scalar = list_element(self.name_type(node.value))
+        if scalar is None:
+            raise NotImplementedError(ast.unparse(node))
+        source = self.visit_Name(node.value)
+        tensor = self.emit(cast_op(source, self.value_types[source.name], tensor_type(scalar)))
+        index_type = SimpleType("index")
+        index = Operator("unrealized_conversion_cast", dialect="builtin")
+        index.return_types.append(index_type)
+        self.process_operand(index, node.slice, "slice")
+        position = self.emit(index)
+        if not (isinstance(node.slice, ast.Constant) and type(node.slice.value) is int and node.slice.value >= 0):
+            # python counts negative indices from the end, tensor.extract does not
+            zero = self.emit(constant_op("0", index_type))
+            negative = Operator("cmpi", dialect="arith")
+            negative.arguments += [position, zero]
+            negative.argument_types += [index_type, index_type]
+            negative.return_types.append(SimpleType("i1"))
+            negative.attributes['predicate'] = LiteralAttr("2 : i64")
+            from_end = Operator("addi", dialect="arith")
+            from_end.arguments += [position, self.tensor_length(tensor, scalar, zero)]
+            from_end.argument_types += [index_type, index_type]
+            from_end.return_types.append(index_type)
+            select = Operator("select", dialect="arith")
+            select.arguments += [self.emit(negative), self.emit(from_end), position]
+            select.argument_types += [SimpleType("i1"), index_type, index_type]
+            select.return_types.append(index_type)
+            position = self.emit(select)
+        op = Operator("extract", dialect="tensor")
+        op.arguments += [tensor, position]
+        op.argument_types += [tensor_type(scalar), SimpleType("index")]
+        op.return_types.append(SimpleType(TENSOR_ELEMENT_TYPES[scalar]))
+        return cast_op(self.emit(op), op.return_types[0], SimpleType(f"!_.{scalar}"))
 
     def visit_Starred(self, node: ast.Starred) -> Operator:
         raise NotImplementedError(ast.unparse(node))
 
     def visit_Name(self, node: ast.Name) -> ValueId:
+        if node.id in self.bound_names:
+            return self.bound_names[node.id]
         if node.id in self.var_scopes[-1]:
             op = Operator("load")
             op.attributes['name'] = node.id
-            op.return_names.append(ValueId(f"%{node.id}_{str(id(op))[-2:]}"))
+            op.return_names.append(self.fresh_name(node.id))
             self.parent_blocks[-1].append(op)
             return op.return_names[-1]
         else:
@@ -510,7 +875,7 @@ class PyVisitor(ast.NodeVisitor):
         return [self.visit_arg(a) for a in node.args]
 
     def visit_arg(self, node: ast.arg) -> Tuple[ValueId, SimpleType]:
-        assert isinstance(node.annotation, ast.Name)
+        assert isinstance(node.annotation, (ast.Name, ast.Subscript))
         return ValueId(f"%{node.arg}"), parse_type(node.annotation)
 
     def visit_keyword(self, node: ast.keyword) -> Operator: